@@ -9,3 +9,43 @@ TELEGRAM_CHAT_ID = "your_chat_id"
 
 # Fallback Instruments
 FALLBACK_INSTRUMENTS = ['BTC/USD', 'ETH/USD', 'EUR/USD', 'GBP/USD', 'XAU/USD']
+
+# Trade Execution
+AUTO_TRADE_ENABLED = False
+TRADE_POOL_SIZE = 10
+TRADE_SETTINGS = {
+    'default': {'enabled': True, 'amount': 1, 'duration': 1, 'timeout': 3, 'retries': 2},
+    # Per-instrument overrides, e.g.
+    # 'BTC/USD OTC': {'amount': 5, 'duration': 2},
+}
+
+# Multi-timeframe Features (built locally from the 1-minute feed)
+MTF_TIMEFRAMES = [300, 900]
+USE_MTF_FEATURES = False
+
+# Scan Scheduling
+SCAN_CLOSE_DELAY = 1.0  # seconds after a candle closes before the first scan
+SCAN_SPREAD = 10.0  # scans and retries due within this window of each other run as one batch
+
+# Signal Memoization
+SIGNAL_CACHE_SIZE = 1024  # (instrument, candle, model version) decisions kept in memory
+
+# Model Registry
+MODEL_DIR = "models"  # per-instrument / per-cluster models live in MODEL_DIR/<name>/
+MODEL_CACHE_SIZE = 20  # specialised models kept loaded at once
+PER_INSTRUMENT_MODELS = False  # let the retrainer train specialised models as well
+MODEL_CLUSTERS = {
+    # Instruments that share one specialised model, e.g.
+    # 'crypto': ['BTC/USD OTC', 'ETH/USD OTC'],
+}
+
+# Training-data Lake
+DATA_LAKE_DIR = "data_lake"  # Parquet files partitioned by instrument and date
+TRAINING_DAYS = 90  # how much lake history retraining reads
+INGEST_INTERVAL_HOURS = 4  # lake ingestion runs this often between nightly retrains
+INGEST_MAX_CANDLES = 5000  # largest 1-minute history requested per instrument
+INGEST_WARMUP = 600  # extra minutes fetched before the newest stored candle for indicator warm-up
+
+# Batch Scan (which instruments go on to the model)
+BATCH_RSI_BAND = (35, 65)  # RSI outside this band makes an instrument a candidate
+BATCH_BREAKOUT_ATR = 1.0  # ...as does being within this many ATRs of a previous-day level
@@ -1,3 +1,4 @@
+import os
 import time
 import schedule
 import joblib
@@ -8,65 +9,104 @@ from tensorflow.keras.layers import LSTM, Dense, Dropout
 from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 from pocket_option_api import PocketOptionAPI
-from config import FALLBACK_INSTRUMENTS
+from candles import CANDLE_FIELDS
+from indicators import compute_features, valid_rows, FEATURE_COLUMNS
+from timeframes import aligned_features, mtf_feature_columns
+from model_registry import ModelRegistry, GLOBAL_MODEL, GLOBAL_SCALER
+from data_lake import TrainingDataLake
+from config import (FALLBACK_INSTRUMENTS, MTF_TIMEFRAMES, USE_MTF_FEATURES,
+                    PER_INSTRUMENT_MODELS, TRAINING_DAYS, INGEST_INTERVAL_HOURS,
+                    INGEST_MAX_CANDLES, INGEST_WARMUP)
 
 class ModelRetrainer:
-    def _init_(self, api_client):
+    def __init__(self, api_client):
         self.api = api_client
         self.instruments = self.api.get_otc_instruments() or FALLBACK_INSTRUMENTS
+        self.registry = ModelRegistry()
+        self.lake = TrainingDataLake()
     
-    def fetch_training_data(self):
+    def build_training_frame(self, candles):
+        """Closed candles with the same features the scanner serves, plus next-candle labels"""
+        # The newest candle is still forming; only closed candles are labelled
+        candles = candles[:-1]
+        if not candles:
+            return pd.DataFrame()
+        features = compute_features(candles)
+        columns = {field: candles[field] for field in CANDLE_FIELDS}
+        columns.update((c, features[c]) for c in FEATURE_COLUMNS)
+        # Always computed so every lake partition has the same schema
+        columns.update(aligned_features(candles, MTF_TIMEFRAMES))
+        
+        # Create labels (1: price increased next candle, 0: decreased)
+        close = candles.close
+        target = np.zeros(len(close), dtype=np.int64)
+        target[:-1] = close[1:] > close[:-1]
+        columns['target'] = target
+        
+        # Only rows the scanner would treat as ready; the last row has no next candle yet
+        keep = valid_rows(features)
+        keep[-1] = False
+        return pd.DataFrame(columns)[keep].reset_index(drop=True)
+    
+    def fetch_training_data(self, instruments=None):
         all_data = []
         
-        for instrument in self.instruments[:5]:
+        for instrument in instruments or self.instruments[:5]:
             try:
-                data = self.api.get_historical_data(instrument, count=1000)
-                if not data:
+                candles = self.api.get_candles(instrument, count=1000)
+                if not candles:
                     continue
-                
-                df = pd.DataFrame(data, columns=['timestamp', 'open', 'high', 'low', 'close'])
-                df = self.calculate_features(df)
-                
-                # Create labels (1: price increased next candle, 0: decreased)
-                df['target'] = (df['close'].shift(-1) > df['close']).astype(int)
-                all_data.append(df.dropna())
+                all_data.append(self.build_training_frame(candles))
             except Exception as e:
                 print(f"⚠ Training data error for {instrument}: {str(e)}")
         
         return pd.concat(all_data) if all_data else pd.DataFrame()
     
-    def calculate_features(self, df):
-        # RSI
-        diff = df['close'].diff()
-        gain = diff.where(diff > 0, 0)
-        loss = -diff.where(diff < 0, 0)
-        avg_gain = gain.rolling(14).mean()
-        avg_loss = loss.rolling(14).mean()
-        rs = avg_gain / avg_loss
-        df['rsi'] = 100 - (100 / (1 + rs)).fillna(50)
-        
-        # MACD
-        ema12 = df['close'].ewm(span=12, adjust=False).mean()
-        ema26 = df['close'].ewm(span=26, adjust=False).mean()
-        df['macd'] = ema12 - ema26
-        
-        # ATR
-        high_low = df['high'] - df['low']
-        high_close = (df['high'] - df['close'].shift()).abs()
-        low_close = (df['low'] - df['close'].shift()).abs()
-        true_range = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-        df['atr'] = true_range.rolling(14).mean().fillna(method='bfill')
-        
-        # Volatility
-        df['returns'] = df['close'].pct_change()
-        df['volatility'] = df['returns'].rolling(10).std().fillna(0)
-        
-        # Bollinger Band Width
-        bb_upper = df['close'].rolling(20).mean() + 2 * df['close'].rolling(20).std()
-        bb_lower = df['close'].rolling(20).mean() - 2 * df['close'].rolling(20).std()
-        df['bb_width'] = (bb_upper - bb_lower) / df['close'].rolling(20).mean()
-        
-        return df.dropna()
+    def ingest_count(self, latest):
+        """Candles to request so the fetch reaches back past the newest stored one"""
+        if latest is None:
+            return INGEST_MAX_CANDLES
+        missing = (int(time.time()) - latest) // 60
+        # Warm-up rows let indicators (incl. 15m MTF features) settle before the first new row;
+        # +2 for the still-forming candle and the last, not yet labelled one
+        return int(min(missing + INGEST_WARMUP + 2, INGEST_MAX_CANDLES))
+    
+    def ingest_instruments(self):
+        return self.instruments if PER_INSTRUMENT_MODELS else self.instruments[:5]
+    
+    def ingest(self, instruments=None):
+        """Append newly closed candles (with features and labels) to the training-data lake"""
+        total = 0
+        for instrument in instruments or self.ingest_instruments():
+            try:
+                latest = self.lake.latest_timestamp(instrument)
+                candles = self.api.get_candles(instrument, count=self.ingest_count(latest))
+                if not candles:
+                    continue
+                if latest is not None and candles.timestamp[0] > latest + 60:
+                    print(f"⚠ Training-data gap for {instrument}: history starts after the last stored candle")
+                df = self.build_training_frame(candles)
+                if latest is not None:
+                    df = df[df['timestamp'] > latest]
+                total += self.lake.append(instrument, df)
+            except Exception as e:
+                print(f"⚠ Ingestion error for {instrument}: {str(e)}")
+        print(f"🗄 Training-data lake: {total} new candles stored")
+        return total
+    
+    def load_training_data(self, instruments=None, columns=None):
+        """Recent TRAINING_DAYS of lake data, falling back to a live fetch when the lake is empty"""
+        instruments = instruments or self.instruments[:5]
+        start = int(time.time()) - TRAINING_DAYS * 86400
+        try:
+            data = self.lake.read(instruments, columns=columns and columns + ['target'], start=start)
+        except Exception as e:
+            print(f"⚠ Training-data lake read error: {str(e)}")
+            data = pd.DataFrame()
+        if data.empty:
+            return self.fetch_training_data(instruments)
+        # Chronological order keeps the validation split on the most recent candles
+        return data.sort_values('timestamp', kind='stable')
     
     def build_model(self, input_shape):
         model = Sequential([
@@ -86,21 +126,25 @@ class ModelRetrainer:
         
         return model
     
-    def retrain_model(self):
-        print("🔄 Starting model retraining...")
+    def retrain_model(self, instruments=None, model_path=GLOBAL_MODEL, scaler_path=GLOBAL_SCALER, label='global'):
+        print(f"🔄 Starting model retraining ({label})...")
         try:
-            data = self.fetch_training_data()
+            columns = list(FEATURE_COLUMNS)
+            if USE_MTF_FEATURES:
+                columns += mtf_feature_columns(MTF_TIMEFRAMES)
+            
+            data = self.load_training_data(instruments, columns)
+            data = data.dropna(subset=columns + ['target']) if not data.empty else data
             if data.empty:
                 print("⚠ No training data available")
                 return False
                 
-            features = data[['rsi', 'macd', 'atr', 'volatility', 'bb_width']]
+            features = data[columns]
             targets = data['target']
             
             # Scale features
             scaler = StandardScaler()
             scaled_features = scaler.fit_transform(features)
-            joblib.dump(scaler, 'scaler.pkl')
             
             # Reshape for LSTM
             X = scaled_features.reshape((scaled_features.shape[0], 1, scaled_features.shape[1]))
@@ -126,8 +170,13 @@ class ModelRetrainer:
             
             # Save if performance is acceptable
             if val_acc > 0.75:
-                model.save('otc_model.h5')
-                print("💾 Model successfully saved")
+                directory = os.path.dirname(model_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                # Scaler first: the registry picks up a new version when the model file changes
+                joblib.dump(scaler, scaler_path)
+                model.save(model_path)
+                print(f"💾 Model successfully saved to {model_path}")
                 return True
             
             print("⚠ Model performance below threshold - keeping previous version")
@@ -136,6 +185,31 @@ class ModelRetrainer:
         except Exception as e:
             print(f"❌ Retraining failed: {str(e)}")
             return False
+    
+    def model_groups(self):
+        """Specialised model name -> instruments trained on it (clusters, then singletons)"""
+        groups = {name: list(members) for name, members in self.registry.clusters.items()}
+        clustered = {i for members in groups.values() for i in members}
+        for instrument in self.instruments:
+            if instrument not in clustered:
+                groups[instrument] = [instrument]
+        return groups
+    
+    def retrain_specialised(self):
+        results = {}
+        for name, members in self.model_groups().items():
+            model_path, scaler_path = self.registry.paths(name)
+            results[name] = self.retrain_model(members, model_path, scaler_path, label=name)
+        trained = sum(results.values())
+        print(f"📊 Specialised models updated: {trained}/{len(results)}")
+        return results
+    
+    def retrain_all(self):
+        self.ingest()
+        success = self.retrain_model()
+        if PER_INSTRUMENT_MODELS:
+            self.retrain_specialised()
+        return success
 
 def main():
     api = PocketOptionAPI()
@@ -143,18 +217,20 @@ def main():
     
     # Initial training
     print("🔧 Performing initial training...")
-    if retrainer.retrain_model():
+    if retrainer.retrain_all():
         print("🎉 Initial training successful")
     else:
         print("⚠ Initial training failed")
     
     # Schedule daily retraining at market close
-    schedule.every().day.at("23:00").do(retrainer.retrain_model)
+    schedule.every().day.at("23:00").do(retrainer.retrain_all)
+    # Ingest between retrains so a capped history request never leaves a gap
+    schedule.every(INGEST_INTERVAL_HOURS).hours.do(retrainer.ingest)
     
     print("⏰ Retrainer active. Waiting for scheduled tasks...")
     while True:
         schedule.run_pending()
         time.sleep(3600)  # Check hourly
 
-if _name_ == "_main_":
+if __name__ == "__main__":
     main()
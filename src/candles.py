@@ -0,0 +1,112 @@
+import json
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+CANDLE_DTYPE = np.dtype([
+    ('timestamp', np.int64),
+    ('open', np.float64),
+    ('high', np.float64),
+    ('low', np.float64),
+    ('close', np.float64)
+])
+CANDLE_FIELDS = CANDLE_DTYPE.names
+
+def loads(content):
+    """Decode JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+class Candles:
+    """Compact OHLC series backed by a NumPy structured array
+
+    Column access (``candles.close``) returns views into the same buffer,
+    so feature code can read the series without copying it.
+    """
+
+    def __init__(self, array=None):
+        if array is None:
+            array = np.empty(0, dtype=CANDLE_DTYPE)
+        self.array = array
+
+    @classmethod
+    def from_rows(cls, rows):
+        if rows is None or len(rows) == 0:
+            return cls()
+        matrix = np.asarray(rows, dtype=np.float64)
+        if matrix.ndim != 2 or matrix.shape[1] < len(CANDLE_FIELDS):
+            raise ValueError(f"Unexpected candle shape {matrix.shape}")
+        array = np.empty(len(matrix), dtype=CANDLE_DTYPE)
+        for i, field in enumerate(CANDLE_FIELDS):
+            array[field] = matrix[:, i]
+        return cls(array)
+
+    @classmethod
+    def from_bytes(cls, content, key='candles'):
+        """Decode a chart response body
+
+        The JSON parser still yields nested lists; they are copied once into
+        the structured array and not kept around.
+        """
+        data = loads(content)
+        return cls.from_rows(data.get(key) or [])
+
+    def __len__(self):
+        return len(self.array)
+
+    def __bool__(self):
+        return len(self.array) > 0
+
+    def __getitem__(self, item):
+        if isinstance(item, str):
+            return self.array[item]
+        if isinstance(item, slice):
+            return Candles(self.array[item])
+        return self.array[item]
+
+    @property
+    def timestamp(self):
+        return self.array['timestamp']
+
+    @property
+    def open(self):
+        return self.array['open']
+
+    @property
+    def high(self):
+        return self.array['high']
+
+    @property
+    def low(self):
+        return self.array['low']
+
+    @property
+    def close(self):
+        return self.array['close']
+
+    @property
+    def last_timestamp(self):
+        return int(self.array['timestamp'][-1]) if len(self.array) else None
+
+    def to_rows(self):
+        return self.array.tolist()
+
+    def to_frame(self):
+        import pandas as pd
+        return pd.DataFrame(self.array)
+
+def stack_candles(candles_by_instrument, window):
+    """Latest `window` candles of every instrument as one 2-D Candles matrix
+
+    Instruments with fewer than `window` candles are left out; returns the
+    instruments in row order alongside the matrix.
+    """
+    instruments = [i for i, c in candles_by_instrument.items() if len(c) >= window]
+    if not instruments:
+        return [], Candles(np.empty((0, window), dtype=CANDLE_DTYPE))
+    matrix = np.stack([candles_by_instrument[i].array[-window:] for i in instruments])
+    return instruments, Candles(matrix)
@@ -0,0 +1,99 @@
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from model_registry import model_slug
+from config import DATA_LAKE_DIR
+
+PARTITIONING = ds.partitioning(
+    pa.schema([('instrument', pa.string()), ('date', pa.string())]),
+    flavor='hive'
+)
+
+def candle_date(timestamps):
+    return pd.to_datetime(np.asarray(timestamps), unit='s', utc=True).strftime('%Y-%m-%d')
+
+class TrainingDataLake:
+    """Parquet store of candles, features and labels, partitioned by instrument and UTC date
+
+    Layout: <root>/instrument=<slug>/date=YYYY-MM-DD/part.parquet, one file per
+    partition. Appends only add candles whose timestamp is not already stored.
+    """
+
+    def __init__(self, root=DATA_LAKE_DIR):
+        self.root = root
+
+    def partition_path(self, instrument, date):
+        return os.path.join(
+            self.root, f"instrument={model_slug(instrument)}", f"date={date}", 'part.parquet'
+        )
+
+    def append(self, instrument, frame):
+        """Store rows not yet in the lake; returns how many were new"""
+        if frame.empty:
+            return 0
+        frame = frame.drop(columns=['instrument', 'date'], errors='ignore').reset_index(drop=True)
+        dates = candle_date(frame['timestamp'])
+        added = 0
+        for date, rows in frame.groupby(dates):
+            path = self.partition_path(instrument, date)
+            if os.path.exists(path):
+                stored = pq.read_table(path).to_pandas()
+                rows = rows[~rows['timestamp'].isin(stored['timestamp'])]
+                if rows.empty:
+                    continue
+                merged = pd.concat([stored, rows], ignore_index=True)
+            else:
+                merged = rows
+            merged = merged.sort_values('timestamp').reset_index(drop=True)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Dot prefix: pyarrow datasets skip it, so a leftover temp file never breaks read()
+            tmp_path = os.path.join(os.path.dirname(path), '.part.parquet.tmp')
+            pq.write_table(pa.Table.from_pandas(merged, preserve_index=False), tmp_path)
+            os.replace(tmp_path, path)
+            added += len(rows)
+        return added
+
+    def read(self, instruments=None, columns=None, start=None, end=None):
+        """Load rows for the given instruments and [start, end) epoch-second range
+
+        Instrument and date filters prune whole partitions; the timestamp
+        filter is pushed down to Parquet row-group statistics.
+        """
+        if not os.path.isdir(self.root):
+            return pd.DataFrame(columns=columns)
+        dataset = ds.dataset(self.root, format='parquet', partitioning=PARTITIONING)
+        if not dataset.files:
+            return pd.DataFrame(columns=columns)
+
+        conditions = []
+        if instruments:
+            conditions.append(ds.field('instrument').isin([model_slug(i) for i in instruments]))
+        if start is not None:
+            conditions.append(ds.field('date') >= candle_date([start])[0])
+            conditions.append(ds.field('timestamp') >= start)
+        if end is not None:
+            conditions.append(ds.field('date') <= candle_date([end])[0])
+            conditions.append(ds.field('timestamp') < end)
+        condition = None
+        for c in conditions:
+            condition = c if condition is None else condition & c
+
+        if columns is not None:
+            columns = list(dict.fromkeys(['timestamp', *columns]))
+        table = dataset.to_table(columns=columns, filter=condition)
+        return table.to_pandas()
+
+    def latest_timestamp(self, instrument):
+        """Newest stored candle for an instrument, or None"""
+        directory = os.path.dirname(os.path.dirname(self.partition_path(instrument, '')))
+        if not os.path.isdir(directory):
+            return None
+        dates = sorted(d for d in os.listdir(directory) if d.startswith('date='))
+        if not dates:
+            return None
+        path = os.path.join(directory, dates[-1], 'part.parquet')
+        timestamps = pq.read_table(path, columns=['timestamp'])['timestamp'].to_numpy()
+        return int(np.max(timestamps)) if len(timestamps) else None
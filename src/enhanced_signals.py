@@ -1,145 +1,311 @@
-import pandas as pd
 import numpy as np
-import joblib
-import time
 import os
-from ta.momentum import RSIIndicator
-from ta.volatility import BollingerBands, AverageTrueRange
-from ta.trend import MACD
-from tensorflow.keras.models import load_model
+import threading
+from collections import OrderedDict
+from candles import stack_candles
+from indicators import compute_features, valid_rows, feature_row
+from timeframes import TimeframeAggregator, mtf_feature_columns
+from model_registry import ModelRegistry
 from pocket_option_api import PocketOptionAPI
-from config import FALLBACK_INSTRUMENTS
+from config import (FALLBACK_INSTRUMENTS, MTF_TIMEFRAMES, USE_MTF_FEATURES, SIGNAL_CACHE_SIZE,
+                    BATCH_RSI_BAND, BATCH_BREAKOUT_ATR)
+
+class SignalCache:
+    """Bounded LRU of scan results with hit/miss counters"""
+
+    def __init__(self, maxsize=SIGNAL_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def peek(self, key):
+        with self._lock:
+            return self.entries.get(key)
+
+    def put(self, key, entry):
+        with self._lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self.entries),
+                'hit_rate': self.hits / total if total else 0.0
+            }
 
 class EnhancedSignalGenerator:
-    def _init_(self, api_client):
+    def __init__(self, api_client):
         self.api = api_client
         self.prev_day_data = {}
-        self.model = self._load_model()
-        self.scaler = self._load_scaler()
+        self.aggregator = TimeframeAggregator(MTF_TIMEFRAMES)
+        self.scan_state = {}
+        self.cache = SignalCache()
+        self.registry = ModelRegistry()
+        # Model signals waiting for the next candle: instrument -> direction, close, timestamp
+        self.pending = {}
+        # Memo key behind each instrument's latest decision, so callers can tell repeats apart
+        self.decision_keys = {}
         self.load_previous_day()
     
-    def _load_model(self):
-        try:
-            return load_model('otc_model.h5')
-        except:
-            print("⚠ Model load failed - using fallback strategy")
-            return None
-    
-    def _load_scaler(self):
-        try:
-            return joblib.load('scaler.pkl')
-        except:
-            print("⚠ Scaler load failed - using default scaling")
-            return None
-    
     def load_previous_day(self):
         instruments = self.api.get_otc_instruments() or FALLBACK_INSTRUMENTS
         for instrument in instruments[:5]:
             try:
-                data = self.api.get_historical_data(instrument, 1440, 2)
+                # Prefer the daily bar built from the 1-minute stream over another round trip
+                levels = self.aggregator.previous_day(instrument)
+                if levels:
+                    self.prev_day_data[instrument] = levels
+                    continue
+                data = self.api.get_candles(instrument, 1440, 2)
                 if len(data) >= 2:
                     self.prev_day_data[instrument] = {
-                        'high': data[-2][2],
-                        'low': data[-2][3],
-                        'close': data[-2][4]
+                        'high': float(data.high[-2]),
+                        'low': float(data.low[-2]),
+                        'close': float(data.close[-2])
                     }
             except Exception as e:
                 print(f"⚠ Previous day load error for {instrument}: {str(e)}")
     
-    def calculate_features(self, df):
-        try:
-            # Basic features
-            df['returns'] = df['close'].pct_change()
-            df['volatility'] = df['returns'].rolling(10).std().fillna(0)
-            
-            # RSI
-            rsi = RSIIndicator(df['close'], window=14)
-            df['rsi'] = rsi.rsi().fillna(50)
-            
-            # MACD
-            macd = MACD(df['close'])
-            df['macd'] = macd.macd().fillna(0)
-            df['macd_signal'] = macd.macd_signal().fillna(0)
-            df['macd_diff'] = macd.macd_diff().fillna(0)
-            
-            # Bollinger Bands
-            bb = BollingerBands(df['close'], window=20)
-            df['bb_upper'] = bb.bollinger_hband().fillna(method='bfill')
-            df['bb_middle'] = bb.bollinger_mavg().fillna(method='bfill')
-            df['bb_lower'] = bb.bollinger_lband().fillna(method='bfill')
-            df['bb_width'] = (df['bb_upper'] - df['bb_lower']) / df['bb_middle']
-            
-            # ATR
-            atr = AverageTrueRange(df['high'], df['low'], df['close'], window=14)
-            df['atr'] = atr.average_true_range().fillna(method='bfill')
-            
-            # Price relationships
-            df['close_vs_high'] = df['close'] / df['high'].rolling(5).max()
-            df['close_vs_low'] = df['close'] / df['low'].rolling(5).min()
-            
-            return df.dropna()
-        except Exception as e:
-            print(f"⚠ Feature calculation error: {str(e)}")
-            return df
+    def generate_signal(self, instrument):
+        """Signal for one instrument, through the same batch path as scan_all
+
+        Model signals are HOLD until confirm_pending sees the next candle.
+        """
+        return self.scan_all([instrument]).get(instrument, 'HOLD')
     
-    def detect_breakout(self, instrument, current_candle):
-        if instrument not in self.prev_day_data:
-            return False
+    def memo_key(self, instrument, timestamp):
+        return instrument, timestamp, self.registry.version(instrument)
+    
+    def cached_features(self, instrument, timestamp):
+        """Feature row the cached decision for this candle was based on, if any"""
+        cached = self.cache.peek(self.memo_key(instrument, timestamp))
+        return cached['features'] if cached else None
+    
+    def _ml_direction(self, instrument, row):
+        """Model direction (0: up, 1: down) if confident enough, else None"""
+        model, scaler = self.registry.resolve(instrument)
+        if not (model and scaler):
+            return None, row
+        if USE_MTF_FEATURES:
+            mtf = self.aggregator.latest_features(instrument)
+            row = np.append(row, [mtf[c] for c in mtf_feature_columns(MTF_TIMEFRAMES)])
+            if np.isnan(row).any():
+                return None, row
+        scaled = scaler.transform(row.reshape(1, -1))
+        X = scaled.reshape(1, 1, scaled.shape[1])
         
-        prev = self.prev_day_data[instrument]
-        upper_break = current_candle['high'] > prev['high']
-        lower_break = current_candle['low'] < prev['low']
+        prediction = model.predict(X, verbose=0)
+        direction = np.argmax(prediction)
+        confidence = np.max(prediction)
         
-        return upper_break or lower_break
+        if confidence < 0.92:
+            return None, row
+        return direction, row
     
-    def generate_signal(self, instrument):
-        try:
-            # Fetch data
-            raw_data = self.api.get_historical_data(instrument, count=100)
-            if not raw_data:
-                return 'HOLD'
-            
-            # Create DataFrame
-            df = pd.DataFrame(raw_data, columns=['timestamp', 'open', 'high', 'low', 'close'])
-            df = self.calculate_features(df)
-            
-            if len(df) < 10:
-                return 'HOLD'
-            
-            # Current candle data
-            current_candle = df.iloc[-1].to_dict()
-            
-            # Breakout detection
-            if self.detect_breakout(instrument, current_candle):
-                return 'BREAKOUT'
-            
-            # ML signal generation
-            if self.model and self.scaler:
-                features = df.iloc[-1][['rsi', 'macd', 'macd_diff', 'atr', 'volatility', 'bb_width']]
-                scaled = self.scaler.transform([features])
-                X = scaled.reshape(1, 1, scaled.shape[1])
-                
-                prediction = self.model.predict(X, verbose=0)
-                direction = np.argmax(prediction)
-                confidence = np.max(prediction)
-                
-                if confidence < 0.92:
-                    return 'HOLD'
-                
-                # Next candle validation
-                time.sleep(60)  # Wait for next candle
-                next_data = self.api.get_historical_data(instrument, count=1)
-                if not next_data:
-                    return 'HOLD'
-                
-                next_close = next_data[0][4]
-                current_close = current_candle['close']
-                
-                if (direction == 0 and next_close > current_close) or \
-                   (direction == 1 and next_close < current_close):
-                    return 'BUY' if direction == 0 else 'SELL'
+    def _confirm(self, instrument, direction, current_close, timestamp):
+        """BUY/SELL if the candle after `timestamp` closed in the predicted direction
+
+        Returns None while that candle has not closed yet, so the caller can
+        check again shortly instead of judging noise within one candle.
+        """
+        next_data = self.api.get_candles(instrument, count=3)
+        if not next_data:
+            return None
+        # The newest candle is still forming
+        closed = next_data[:-1]
+        later = closed.close[closed.timestamp > timestamp]
+        if not len(later):
+            return None
+        
+        next_close = later[0]
+        
+        if (direction == 0 and next_close > current_close) or \
+           (direction == 1 and next_close < current_close):
+            return 'BUY' if direction == 0 else 'SELL'
+        return 'HOLD'
+    
+    def batch_scan(self, candles_by_instrument, window=100):
+        """Features, breakout flags and ML candidate mask for many instruments at once
+
+        The latest `window` candles of every instrument are stacked into one
+        matrix, so each indicator and comparison is a single NumPy operation
+        across all instruments. Instruments with a shorter history are left out.
+        """
+        instruments, matrix = stack_candles(candles_by_instrument, window)
+        features = compute_features(matrix)
+        valid = valid_rows(features)
+        ready = (valid.sum(axis=-1) >= 10) & valid[..., -1]
+        
+        levels = [self.prev_day_data.get(i) or {} for i in instruments]
+        prev_high = np.array([p.get('high', np.inf) for p in levels], dtype=np.float64)
+        prev_low = np.array([p.get('low', -np.inf) for p in levels], dtype=np.float64)
+        
+        high = features['high'][..., -1]
+        low = features['low'][..., -1]
+        close = features['close'][..., -1]
+        atr = features['atr'][..., -1]
+        rsi = features['rsi'][..., -1]
+        breakout = ready & ((high > prev_high) | (low < prev_low))
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            distance = np.minimum(prev_high - close, close - prev_low) / atr
+        distance[~np.isfinite(distance) | (atr <= 0)] = np.nan
+        
+        rsi_low, rsi_high = BATCH_RSI_BAND
+        candidates = ready & ~breakout & (
+            (rsi <= rsi_low) | (rsi >= rsi_high) | (np.abs(distance) <= BATCH_BREAKOUT_ATR)
+        )
+        
+        return {
+            'instruments': instruments,
+            'timestamps': matrix.timestamp[..., -1],
+            'features': features,
+            'rows': feature_row(features),
+            'ready': ready,
+            'breakout': breakout,
+            'breakout_distance': distance,
+            'candidates': candidates
+        }
+    
+    def _scan_group(self, group, length, timestamps, results):
+        """Batch-scan instruments sharing one history length into `results`"""
+        scan = self.batch_scan(group, length)
+        for n, instrument in enumerate(scan['instruments']):
+            row = scan['rows'][n]
+            if not scan['ready'][n]:
+                results[instrument] = ('HOLD', None)
+                continue
+            distance = scan['breakout_distance'][n]
+            self.scan_state[instrument] = {
+                'timestamp': int(scan['timestamps'][n]),
+                'volatility': float(scan['features']['volatility'][n, -1]),
+                'breakout_distance': None if np.isnan(distance) else float(distance)
+            }
+            if scan['breakout'][n]:
+                results[instrument] = ('BREAKOUT', row)
+            elif not scan['candidates'][n]:
+                results[instrument] = ('HOLD', row)
+            else:
+                try:
+                    direction, row = self._ml_direction(instrument, row)
+                except Exception as e:
+                    print(f"⚠ Signal generation error: {str(e)}")
+                    direction = None
+                results[instrument] = ('HOLD', row)
+                if direction is not None:
+                    # Confirmed against the next candle by confirm_pending, not here
+                    self.pending[instrument] = {
+                        'direction': direction,
+                        'close': float(scan['features']['close'][n, -1]),
+                        'timestamp': timestamps[instrument]
+                    }
+    
+    def scan_all(self, instruments, window=100):
+        """Signals for many instruments; only batch-scan candidates reach the model
+
+        Each instrument is judged on its last closed candle; the memo key and
+        any pending confirmation use that candle's timestamp.
+        """
+        signals = {}
+        fresh = {}
+        timestamps = {}
+        for instrument in instruments:
+            try:
+                candles = self.api.get_candles(instrument, count=window + 1)
+            except Exception as e:
+                print(f"⚠ Signal generation error: {str(e)}")
+                candles = None
+            if not candles or len(candles) < 2:
+                signals[instrument] = 'HOLD'
+                continue
+            # The newest candle is still forming; decisions are made on the one that just closed
+            closed = candles[:-1]
+            timestamps[instrument] = closed.last_timestamp
             
-            return 'HOLD'
-        except Exception as e:
-            print(f"⚠ Signal generation error: {str(e)}")
-            return 'HOLD'
+            # Same closed candle and model as a previous scan - reuse its decision
+            key = self.memo_key(instrument, closed.last_timestamp)
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.decision_keys[instrument] = key
+                signals[instrument] = cached['signal']
+                continue
+            try:
+                self.aggregator.update(instrument, candles)
+            except Exception as e:
+                print(f"⚠ Timeframe update error for {instrument}: {str(e)}")
+            fresh[instrument] = closed[-window:]
+        
+        # Shorter histories are batched with others of the same length, so every
+        # instrument goes through the same breakout and candidate rules
+        by_length = {}
+        for instrument, candles in fresh.items():
+            by_length.setdefault(len(candles), {})[instrument] = candles
+        
+        results = {}
+        for length, group in by_length.items():
+            try:
+                self._scan_group(group, length, timestamps, results)
+            except Exception as e:
+                # One bad group must not stall the rest of the batch; HOLD is not memoized
+                print(f"⚠ Signal generation error: {str(e)}")
+                for instrument in group:
+                    results.pop(instrument, None)
+                    self.pending.pop(instrument, None)
+                    signals[instrument] = 'HOLD'
+        
+        for instrument, (signal, row) in results.items():
+            # Re-keyed after evaluation: a specialised model may have failed over to the global one
+            key = self.memo_key(instrument, timestamps[instrument])
+            self.cache.put(key, {'signal': signal, 'features': row})
+            self.decision_keys[instrument] = key
+            signals[instrument] = signal
+        return signals
+    
+    def confirm_pending(self, instruments):
+        """Check pending model signals against the candle that followed them
+
+        Instruments whose next candle has not closed yet stay pending and are
+        left out of the result.
+        """
+        signals = {}
+        for instrument in instruments:
+            pending = self.pending.get(instrument)
+            if pending is None:
+                continue
+            try:
+                signal = self._confirm(instrument, pending['direction'], pending['close'], pending['timestamp'])
+            except Exception as e:
+                print(f"⚠ Signal generation error: {str(e)}")
+                signal = 'HOLD'
+            if signal is None:
+                continue
+            del self.pending[instrument]
+            key = self.memo_key(instrument, pending['timestamp'])
+            cached = self.cache.peek(key)
+            self.cache.put(key, {'signal': signal, 'features': cached['features'] if cached else None})
+            self.decision_keys[instrument] = key
+            signals[instrument] = signal
+        return signals
+    
+    def drop_pending(self, instruments):
+        """Give up on confirmations whose next candle never showed up"""
+        for instrument in instruments:
+            self.pending.pop(instrument, None)
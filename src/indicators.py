@@ -0,0 +1,140 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# NumPy ports of the `ta` indicators used by EnhancedSignalGenerator.
+# They work on plain float arrays (e.g. Candles.close) so the signal path
+# never has to build a DataFrame. Every function runs along the last axis,
+# so a 2-D (instruments x candles) matrix is processed in one pass.
+
+FEATURE_COLUMNS = ['rsi', 'macd', 'macd_diff', 'atr', 'volatility', 'bb_width']
+
+def ewm(values, alpha, min_periods=0):
+    """pandas ``ewm(alpha=..., adjust=False).mean()`` with leading NaNs skipped"""
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        return _ewm_1d(values, alpha, min_periods)
+    out = np.full(values.shape, np.nan)
+    acc = np.full(values.shape[:-1], np.nan)
+    count = np.zeros(values.shape[:-1], dtype=np.int64)
+    decay = 1.0 - alpha
+    for i in range(values.shape[-1]):
+        value = values[..., i]
+        seen = ~np.isnan(value)
+        acc = np.where(np.isnan(acc), value, np.where(seen, decay * acc + alpha * value, acc))
+        count += seen
+        out[..., i] = np.where(count >= max(min_periods, 1), acc, np.nan)
+    return out
+
+def _ewm_1d(values, alpha, min_periods):
+    # Plain-float recursion: per-step NumPy calls on scalars cost far more than the maths
+    out = [np.nan] * len(values)
+    acc = np.nan
+    count = 0
+    decay = 1.0 - alpha
+    threshold = max(min_periods, 1)
+    for i, value in enumerate(values.tolist()):
+        if value == value:
+            acc = value if count == 0 else decay * acc + alpha * value
+            count += 1
+        if count >= threshold:
+            out[i] = acc
+    return np.array(out)
+
+def rolling(values, window, func, **kwargs):
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] >= window:
+        out[..., window - 1:] = func(sliding_window_view(values, window, axis=-1), axis=-1, **kwargs)
+    return out
+
+def shift(values, periods=1):
+    out = np.full(values.shape, np.nan)
+    if periods < values.shape[-1]:
+        out[..., periods:] = values[..., :-periods]
+    return out
+
+def pct_change(values):
+    prev = shift(values)
+    return (values - prev) / prev
+
+def rsi(close, window=14):
+    diff = np.diff(close, prepend=np.nan)
+    up = np.where(diff > 0, diff, 0.0)
+    down = np.where(diff < 0, -diff, 0.0)
+    ema_up = ewm(up, 1.0 / window, window)
+    ema_down = ewm(down, 1.0 / window, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = np.where(ema_down == 0, 100.0, 100.0 - 100.0 / (1.0 + ema_up / ema_down))
+    result[np.isnan(ema_up) | np.isnan(ema_down)] = np.nan
+    return result
+
+def macd(close, fast=12, slow=26, signal=9):
+    ema_fast = ewm(close, 2.0 / (fast + 1), fast)
+    ema_slow = ewm(close, 2.0 / (slow + 1), slow)
+    line = ema_fast - ema_slow
+    signal_line = ewm(line, 2.0 / (signal + 1), signal)
+    return line, signal_line, line - signal_line
+
+def bollinger(close, window=20, dev=2):
+    middle = rolling(close, window, np.mean)
+    std = rolling(close, window, np.std)
+    return middle + dev * std, middle, middle - dev * std
+
+def atr(high, low, close, window=14):
+    prev_close = shift(close)
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    out = np.zeros(close.shape)
+    if close.shape[-1] < window:
+        return out
+    out[..., window - 1] = true_range[..., :window].mean(axis=-1)
+    if close.ndim == 1:
+        acc = out[window - 1]
+        values = out.tolist()
+        for i, tr in enumerate(true_range[window:].tolist(), start=window):
+            acc = (acc * (window - 1) + tr) / window
+            values[i] = acc
+        return np.array(values)
+    for i in range(window, close.shape[-1]):
+        out[..., i] = (out[..., i - 1] * (window - 1) + true_range[..., i]) / window
+    return out
+
+def compute_features(candles):
+    """Feature columns for a Candles series, as a dict of aligned arrays"""
+    close, high, low = candles.close, candles.high, candles.low
+    returns = pct_change(close)
+    volatility = rolling(returns, 10, np.std, ddof=1)
+    volatility[np.isnan(volatility)] = 0.0
+
+    rsi_values = rsi(close)
+    rsi_values[np.isnan(rsi_values)] = 50.0
+
+    macd_line, macd_signal, macd_diff = (np.nan_to_num(x) for x in macd(close))
+
+    bb_upper, bb_middle, bb_lower = bollinger(close)
+
+    return {
+        'close': close,
+        'high': high,
+        'low': low,
+        'returns': returns,
+        'volatility': volatility,
+        'rsi': rsi_values,
+        'macd': macd_line,
+        'macd_signal': macd_signal,
+        'macd_diff': macd_diff,
+        'bb_width': (bb_upper - bb_lower) / bb_middle,
+        'atr': atr(high, low, close),
+        'close_vs_high': close / rolling(high, 5, np.max),
+        'close_vs_low': close / rolling(low, 5, np.min)
+    }
+
+def valid_rows(features):
+    """Boolean mask of rows with every feature defined (the DataFrame ``dropna``)"""
+    mask = np.ones(features['close'].shape, dtype=bool)
+    for values in features.values():
+        mask &= ~np.isnan(values)
+    return mask
+
+def feature_row(features, index=-1, columns=FEATURE_COLUMNS):
+    """Feature vector at `index`; one row per instrument for 2-D input"""
+    return np.stack([features[c][..., index] for c in columns], axis=-1).astype(np.float64)
@@ -1,6 +1,6 @@
 from auto_retrain import ModelRetrainer, PocketOptionAPI
 
-if _name_ == "_main_":
+if __name__ == "__main__":
     api = PocketOptionAPI()
     retrainer = ModelRetrainer(api)
-    retrainer.retrain_model()
+    retrainer.retrain_all()
@@ -0,0 +1,149 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+import joblib
+from tensorflow.keras.models import load_model
+from config import MODEL_DIR, MODEL_CACHE_SIZE, MODEL_CLUSTERS
+
+GLOBAL_MODEL = 'otc_model.h5'
+GLOBAL_SCALER = 'scaler.pkl'
+
+def model_slug(name):
+    """Filesystem-safe directory name for an instrument or cluster"""
+    return re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_')
+
+class ModelRegistry:
+    """Resolves the model/scaler pair for an instrument
+
+    Specialised models (per instrument, or per cluster from MODEL_CLUSTERS)
+    are loaded on first use and kept in a bounded LRU; anything without one
+    falls back to the global model, which stays loaded.
+    """
+
+    def __init__(self, model_dir=MODEL_DIR, clusters=None, max_loaded=MODEL_CACHE_SIZE,
+                 global_model=GLOBAL_MODEL, global_scaler=GLOBAL_SCALER):
+        self.model_dir = model_dir
+        self.clusters = clusters if clusters is not None else MODEL_CLUSTERS
+        self.max_loaded = max_loaded
+        self.global_paths = (global_model, global_scaler)
+        self._cluster_of = {i: name for name, members in self.clusters.items() for i in members}
+        self._loaded = OrderedDict()
+        self._failed = {}
+        self._path_locks = {}
+        self._global = None
+        self._lock = threading.Lock()
+
+    def model_name(self, instrument):
+        return self._cluster_of.get(instrument, instrument)
+
+    def paths(self, name):
+        directory = os.path.join(self.model_dir, model_slug(name))
+        return os.path.join(directory, 'model.h5'), os.path.join(directory, 'scaler.pkl')
+
+    def _specialised_paths(self, instrument):
+        model_path, scaler_path = self.paths(self.model_name(instrument))
+        if os.path.exists(model_path) and os.path.exists(scaler_path):
+            return model_path, scaler_path
+        return None
+
+    def _usable_paths(self, instrument):
+        """Specialised paths unless missing or already known not to load at this mtime"""
+        paths = self._specialised_paths(instrument)
+        if paths is None:
+            return None
+        try:
+            mtime = os.path.getmtime(paths[0])
+        except OSError:
+            return None
+        with self._lock:
+            if self._failed.get(paths) == mtime:
+                return None
+        return paths
+
+    def version(self, instrument):
+        """Identifies the model an instrument resolves to, without loading it
+
+        A specialised model that has not been loaded yet is assumed to load;
+        once it has failed, the global model's version is reported instead.
+        """
+        paths = self._usable_paths(instrument) or self.global_paths
+        try:
+            return paths[0], os.path.getmtime(paths[0])
+        except OSError:
+            return None
+
+    def resolve(self, instrument):
+        """Return (model, scaler) for an instrument; either may be None if nothing loads"""
+        paths = self._usable_paths(instrument)
+        if paths:
+            entry = self._get_specialised(paths)
+            if entry:
+                return entry['model'], entry['scaler']
+        entry = self._get_global()
+        return entry['model'], entry['scaler']
+
+    def _get_specialised(self, paths):
+        mtime = os.path.getmtime(paths[0])
+        with self._lock:
+            entry = self._cached(paths, mtime)
+            if entry or self._failed.get(paths) == mtime:
+                return entry
+            path_lock = self._path_locks.setdefault(paths, threading.Lock())
+
+        # Load outside the registry lock so other instruments keep resolving;
+        # the per-path lock stops two threads loading the same model
+        with path_lock:
+            with self._lock:
+                entry = self._cached(paths, mtime)
+                if entry or self._failed.get(paths) == mtime:
+                    return entry
+            entry = self._load(paths)
+            with self._lock:
+                if entry is None:
+                    # Not retried until the file changes on disk
+                    self._failed[paths] = mtime
+                    return None
+                self._failed.pop(paths, None)
+                self._loaded[paths] = entry
+                while len(self._loaded) > self.max_loaded:
+                    self._loaded.popitem(last=False)
+                return entry
+
+    def _cached(self, paths, mtime):
+        entry = self._loaded.get(paths)
+        if entry and entry['mtime'] == mtime:
+            self._loaded.move_to_end(paths)
+            return entry
+        return None
+
+    def _get_global(self):
+        try:
+            mtime = os.path.getmtime(self.global_paths[0])
+        except OSError:
+            mtime = None
+        with self._lock:
+            # Reload when the retrainer has replaced the global model on disk
+            if self._global is None or self._global['mtime'] != mtime:
+                self._global = self._load(self.global_paths) or {'model': None, 'scaler': None, 'mtime': mtime}
+                if self._global['model'] is None:
+                    print("⚠ Model load failed - using fallback strategy")
+            return self._global
+
+    def _load(self, paths):
+        model_path, scaler_path = paths
+        try:
+            entry = {
+                'model': load_model(model_path),
+                'scaler': joblib.load(scaler_path),
+                'mtime': os.path.getmtime(model_path)
+            }
+            print(f"📦 Loaded model {model_path}")
+            return entry
+        except Exception as e:
+            print(f"⚠ Model load failed for {model_path}: {str(e)}")
+            return None
+
+    def loaded(self):
+        with self._lock:
+            return [model_path for model_path, _ in self._loaded]
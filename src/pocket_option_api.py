@@ -1,12 +1,13 @@
 import requests
 import time
 import os
+from candles import Candles
 from config import POCKET_EMAIL, POCKET_PASSWORD, POCKET_API_KEY
 
 class PocketOptionAPI:
     BASE_URL = "https://api.pocketoption.com"
     
-    def _init_(self):
+    def __init__(self):
         self.email = POCKET_EMAIL
         self.password = POCKET_PASSWORD
         self.api_key = POCKET_API_KEY
@@ -76,6 +77,11 @@ class PocketOptionAPI:
             return ['BTC/USD', 'ETH/USD', 'EUR/USD', 'GBP/USD']  # Fallback
     
     def get_historical_data(self, instrument, interval=60, count=1000):
+        """Candles as plain (timestamp, open, high, low, close) rows"""
+        return self.get_candles(instrument, interval, count).to_rows()
+    
+    def get_candles(self, instrument, interval=60, count=1000):
+        """Chart history decoded straight from the response bytes into Candles"""
         endpoint = f"{self.BASE_URL}/api/chart/history"
         payload = {
             "symbol": instrument,
@@ -85,14 +91,16 @@ class PocketOptionAPI:
         try:
             response = self.session.post(endpoint, json=payload, timeout=15)
             response.raise_for_status()
-            data = response.json()
-            return data.get('candles', [])
+            return Candles.from_bytes(response.content)
         except Exception as e:
             print(f"⚠ Data fetch error for {instrument}: {str(e)}")
-            return []
+            return Candles()
     
-    def place_trade(self, instrument, amount, direction, duration=1):
-        endpoint = f"{self.BASE_URL}/api/v2/binary-options/open"
+    TRADE_PATH = "/api/v2/binary-options/open"
+    
+    @staticmethod
+    def trade_request(instrument, amount, direction, duration=1, client_order_id=None):
+        """Payload and headers for opening a binary option (shared with TradeExecutor)"""
         payload = {
             "symbol": instrument,
             "amount": str(amount),
@@ -100,8 +108,17 @@ class PocketOptionAPI:
             "duration": duration,
             "duration_unit": "m"
         }
+        headers = {}
+        if client_order_id:
+            payload["client_order_id"] = client_order_id
+            headers["Idempotency-Key"] = client_order_id
+        return payload, headers
+    
+    def place_trade(self, instrument, amount, direction, duration=1):
+        endpoint = f"{self.BASE_URL}{self.TRADE_PATH}"
+        payload, headers = self.trade_request(instrument, amount, direction, duration)
         try:
-            response = self.session.post(endpoint, json=payload, timeout=10)
+            response = self.session.post(endpoint, json=payload, headers=headers, timeout=10)
             return response.json()
         except Exception as e:
             print(f"⚠ Trade execution error: {str(e)}")
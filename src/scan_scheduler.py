@@ -0,0 +1,105 @@
+import heapq
+import time
+from config import SCAN_CLOSE_DELAY, SCAN_SPREAD
+
+class ScanScheduler:
+    """Wakes instruments just after their candle closes
+
+    Every candle period the instruments are ranked by recent volatility and
+    proximity to a previous-day breakout and all planned for the close.
+    next_batch hands out everything due within `spread` seconds of the first
+    entry as one batch, most urgent first. The only load spreading is that
+    the batch fetches candles one after another rather than in parallel.
+    An instrument whose latest candle has not rolled over yet is retried
+    shortly instead of waiting for the next period. Model signals awaiting next-candle
+    confirmation are queued for the following close and handed out with
+    that close's batch, so nothing blocks the worker while it waits.
+    """
+
+    def __init__(self, instruments, scan_state, interval=60, close_delay=SCAN_CLOSE_DELAY,
+                 spread=SCAN_SPREAD, retry_delay=2.0, max_retries=3, clock=time.time):
+        self.instruments = list(instruments)
+        self.scan_state = scan_state
+        self.interval = interval
+        self.close_delay = close_delay
+        self.spread = spread
+        self.retry_delay = retry_delay
+        self.max_retries = max_retries
+        self.clock = clock
+        self._queue = []
+        self._seen = {}
+        self._retries = {}
+        self._confirm_retries = {}
+        self._planned_close = None
+
+    def next_close(self, now=None):
+        now = self.clock() if now is None else now
+        return now - now % self.interval + self.interval
+
+    def priority_order(self):
+        """Instruments sorted most-urgent first (rank sum of volatility and breakout distance)"""
+        states = {i: self.scan_state.get(i) or {} for i in self.instruments}
+        by_volatility = sorted(self.instruments, key=lambda i: -(states[i].get('volatility') or 0.0))
+        by_distance = sorted(
+            self.instruments,
+            key=lambda i: abs(d) if (d := states[i].get('breakout_distance')) is not None else float('inf')
+        )
+        rank = {i: by_volatility.index(i) + by_distance.index(i) for i in self.instruments}
+        return sorted(self.instruments, key=lambda i: rank[i])
+
+    def _plan(self):
+        close = self.next_close()
+        if self._planned_close is not None and close <= self._planned_close:
+            close = self._planned_close + self.interval
+        self._planned_close = close
+        due = close + self.close_delay
+        for rank, instrument in enumerate(self.priority_order()):
+            heapq.heappush(self._queue, (due, rank, 'scan', instrument))
+        self._retries = {}
+
+    def next_batch(self):
+        """Return (scans in priority order, confirmations, seconds until the batch is due)"""
+        if not any(kind == 'scan' for _, _, kind, _ in self._queue):
+            self._plan()
+        first_due = self._queue[0][0]
+        scans, confirms = [], []
+        while self._queue and self._queue[0][0] <= first_due + self.spread:
+            _, _, kind, instrument = heapq.heappop(self._queue)
+            batch = confirms if kind == 'confirm' else scans
+            if instrument not in batch:
+                batch.append(instrument)
+        return scans, confirms, max(0.0, first_due - self.clock())
+
+    def schedule_confirmations(self, instruments):
+        """Queue a next-candle confirmation for each instrument at the coming close"""
+        due = self.next_close() + self.close_delay
+        for instrument in instruments:
+            self._confirm_retries[instrument] = 0
+            heapq.heappush(self._queue, (due, -1, 'confirm', instrument))
+
+    def retry_confirmations(self, instruments):
+        """Re-check confirmations whose next candle had not closed yet; returns those given up"""
+        expired = []
+        for instrument in instruments:
+            retries = self._confirm_retries.get(instrument, 0)
+            if retries >= self.max_retries:
+                self._confirm_retries.pop(instrument, None)
+                expired.append(instrument)
+                continue
+            self._confirm_retries[instrument] = retries + 1
+            heapq.heappush(self._queue, (self.clock() + self.retry_delay, -1, 'confirm', instrument))
+        return expired
+
+    def complete(self, instrument):
+        """Record a finished scan; retry soon if the candle had not rolled over yet"""
+        timestamp = (self.scan_state.get(instrument) or {}).get('timestamp')
+        changed = timestamp is None or timestamp != self._seen.get(instrument)
+        self._seen[instrument] = timestamp
+        if changed:
+            return True
+        retries = self._retries.get(instrument, 0)
+        if retries < self.max_retries:
+            self._retries[instrument] = retries + 1
+            due = self.clock() + self.retry_delay
+            heapq.heappush(self._queue, (due, len(self.instruments) + retries, 'scan', instrument))
+        return False
@@ -10,47 +10,118 @@ from telegram import Bot
 from telegram.error import TelegramError
 from pocket_option_api import PocketOptionAPI
 from enhanced_signals import EnhancedSignalGenerator
-from config import TELEGRAM_TOKEN, TELEGRAM_CHAT_ID, FALLBACK_INSTRUMENTS
+from trade_executor import TradeExecutor
+from scan_scheduler import ScanScheduler
+from config import TELEGRAM_TOKEN, TELEGRAM_CHAT_ID, FALLBACK_INSTRUMENTS, AUTO_TRADE_ENABLED
 
 class SignalWorker(QThread):
     signal_detected = pyqtSignal(str, str)  # instrument, signal
     status_update = pyqtSignal(str)
     
-    def _init_(self, signal_gen, instruments):
-        super()._init_()
+    def __init__(self, signal_gen, instruments, executor=None):
+        super().__init__()
         self.signal_gen = signal_gen
         self.instruments = instruments
+        self.executor = executor
+        self.scheduler = ScanScheduler(instruments, signal_gen.scan_state)
+        self.acted = {}  # instrument -> memo key of the last signal emitted
         self.active = True
         
     def run(self):
         while self.active:
             try:
-                for instrument in self.instruments:
-                    if not self.active:
-                        return
-                    
-                    self.status_update.emit(f"Checking {instrument}...")
-                    signal = self.signal_gen.generate_signal(instrument)
-                    
-                    if signal != 'HOLD':
-                        self.signal_detected.emit(instrument, signal)
-                        self.status_update.emit(f"Signal found: {instrument} {signal}")
-                    else:
-                        self.status_update.emit(f"No signal for {instrument}")
-                    
-                    time.sleep(5)  # Brief pause between instruments
+                instruments, confirms, delay = self.scheduler.next_batch()
+                if not self.sleep_for(delay):
+                    return
                 
-                time.sleep(30)  # Main cycle delay
+                found = []
+                if confirms:
+                    confirmed = self.signal_gen.confirm_pending(confirms)
+                    # A next candle that has not closed yet is checked again shortly
+                    waiting = [i for i in confirms if i not in confirmed and i in self.signal_gen.pending]
+                    self.signal_gen.drop_pending(self.scheduler.retry_confirmations(waiting))
+                    found.extend((i, s) for i, s in confirmed.items() if self.is_new(i, s))
+                    # Trade confirmations straight away rather than after this close's scans
+                    self.execute_trades(found, time.perf_counter())
+                
+                if instruments:
+                    self.status_update.emit(f"Scanning {len(instruments)} instruments...")
+                    signals = self.signal_gen.scan_all(instruments)
+                    signal_time = time.perf_counter()
+                    scanned = []
+                    for instrument in instruments:
+                        signal = signals.get(instrument, 'HOLD')
+                        self.scheduler.complete(instrument)
+                        if self.is_new(instrument, signal):
+                            scanned.append((instrument, signal))
+                    self.execute_trades(scanned, signal_time)
+                    found.extend(scanned)
+                    # Model signals are re-checked at the next close instead of blocking here
+                    self.scheduler.schedule_confirmations(
+                        [i for i in instruments if i in self.signal_gen.pending]
+                    )
+                
+                for instrument, signal in found:
+                    self.signal_detected.emit(instrument, signal)
+                if found:
+                    self.status_update.emit(
+                        "Signals found: " + ", ".join(f"{i} {s}" for i, s in found)
+                    )
+                else:
+                    self.status_update.emit(f"No signals in {len(instruments) + len(confirms)} instruments")
             except Exception as e:
                 self.status_update.emit(f"⚠ Worker error: {str(e)}")
                 time.sleep(60)
     
+    def is_new(self, instrument, signal):
+        """True for a BUY/SELL whose decision (candle and model) has not been acted on yet
+
+        A retry on an unchanged candle returns the memoized decision again,
+        while a model swap mid-candle yields a new key and a new decision.
+        """
+        if signal == 'HOLD':
+            return False
+        key = self.signal_gen.decision_keys.get(instrument)
+        if key is not None and self.acted.get(instrument) == key:
+            return False
+        self.acted[instrument] = key
+        return True
+    
+    def sleep_for(self, seconds):
+        """Sleep until the next scheduled scan, staying responsive to stop()"""
+        deadline = time.monotonic() + seconds
+        while self.active:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return True
+            time.sleep(min(remaining, 0.5))
+        return False
+    
+    def execute_trades(self, signals, signal_time):
+        """Hand confirmed (instrument, signal) pairs to the executor in one concurrent batch"""
+        if not self.executor:
+            return
+        for future in self.executor.submit_many(signals, signal_time):
+            future.add_done_callback(self.report_order)
+    
+    def report_order(self, future):
+        try:
+            result = future.result()
+        except Exception as e:
+            self.status_update.emit(f"⚠ Order error: {str(e)}")
+            return
+        self.status_update.emit(
+            f"Order {result['instrument']} {result['signal']}: "
+            f"{'placed' if result.get('success') else 'failed'} "
+            f"in {result['latency_ms']:.0f} ms"
+        )
+    
     def stop(self):
         self.active = False
 
 class TradingDashboard(QMainWindow):
-    def _init_(self):
-        super()._init_()
+    def __init__(self):
+        super().__init__()
         self.setWindowTitle("OTC Signal Master")
         self.setGeometry(100, 100, 800, 600)
         
@@ -61,6 +132,7 @@ class TradingDashboard(QMainWindow):
             self.instruments = self.api.get_otc_instruments() or FALLBACK_INSTRUMENTS
             self.signals = []
             self.worker = None
+            self.executor = TradeExecutor(self.api) if AUTO_TRADE_ENABLED else None
             
             self.init_ui()
             self.init_tray()
@@ -189,7 +261,7 @@ class TradingDashboard(QMainWindow):
         if self.worker and self.worker.isRunning():
             return
             
-        self.worker = SignalWorker(self.signal_gen, self.instruments[:5])
+        self.worker = SignalWorker(self.signal_gen, self.instruments[:5], self.executor)
         self.worker.signal_detected.connect(self.process_signal)
         self.worker.status_update.connect(self.status_bar.showMessage)
         self.worker.start()
@@ -253,6 +325,8 @@ class TradingDashboard(QMainWindow):
     
     def close_app(self):
         self.stop_signal_worker()
+        if self.executor:
+            self.executor.shutdown()
         QApplication.quit()
     
     def closeEvent(self, event):
@@ -261,14 +335,14 @@ class TradingDashboard(QMainWindow):
         event.accept()
 
 class ScheduleTimer(QTimer):
-    def _init_(self):
-        super()._init_()
+    def __init__(self):
+        super().__init__()
         self.timeout.connect(self.run_schedules)
     
     def run_schedules(self):
         schedule.run_pending()
 
-if _name_ == "_main_":
+if __name__ == "__main__":
     app = QApplication(sys.argv)
     app.setStyle("Fusion")
     
@@ -0,0 +1,155 @@
+import threading
+import time
+from collections import deque
+import numpy as np
+from candles import Candles
+from indicators import compute_features
+from config import MTF_TIMEFRAMES
+
+BASE_INTERVAL = 60
+DAY = 86400
+MTF_COLUMNS = ['rsi', 'macd_diff', 'volatility', 'bb_width']
+
+def feature_name(column, timeframe):
+    return f"{column}_{timeframe // 60}m"
+
+def mtf_feature_columns(timeframes=MTF_TIMEFRAMES):
+    return [feature_name(c, tf) for tf in timeframes for c in MTF_COLUMNS]
+
+def resample(candles, timeframe, base_interval=BASE_INTERVAL, complete_only=True):
+    """Aggregate base candles into epoch-aligned bars of `timeframe` seconds"""
+    if not candles:
+        return Candles()
+    ts = candles.timestamp
+    starts = ts - ts % timeframe
+    breaks = np.flatnonzero(np.diff(starts)) + 1
+    first = np.concatenate(([0], breaks))
+    last = np.concatenate((breaks - 1, [len(ts) - 1]))
+
+    bars = np.empty(len(first), dtype=candles.array.dtype)
+    bars['timestamp'] = starts[first]
+    bars['open'] = candles.open[first]
+    bars['high'] = np.maximum.reduceat(candles.high, first)
+    bars['low'] = np.minimum.reduceat(candles.low, first)
+    bars['close'] = candles.close[last]
+
+    if complete_only and ts[-1] + base_interval < starts[-1] + timeframe:
+        bars = bars[:-1]
+    return Candles(bars)
+
+def aligned_features(candles, timeframes=MTF_TIMEFRAMES, base_interval=BASE_INTERVAL):
+    """Higher-timeframe features aligned to each base candle without lookahead
+
+    Each base row only sees bars that had closed by the end of that row's minute.
+    """
+    out = {}
+    if not candles:
+        return out
+    row_close = candles.timestamp + base_interval
+    for tf in timeframes:
+        bars = resample(candles, tf, base_interval)
+        if not bars:
+            for column in MTF_COLUMNS:
+                out[feature_name(column, tf)] = np.full(len(candles), np.nan)
+            continue
+        features = compute_features(bars)
+        idx = np.searchsorted(bars.timestamp + tf, row_close, side='right') - 1
+        seen = idx >= 0
+        for column in MTF_COLUMNS:
+            values = np.full(len(candles), np.nan)
+            values[seen] = features[column][idx[seen]]
+            out[feature_name(column, tf)] = values
+    return out
+
+class TimeframeAggregator:
+    """Builds higher-timeframe bars incrementally from the 1-minute stream"""
+
+    def __init__(self, timeframes=MTF_TIMEFRAMES, base_interval=BASE_INTERVAL, max_bars=500):
+        self.timeframes = sorted(set(timeframes) | {DAY})
+        self.base_interval = base_interval
+        self.max_bars = max_bars
+        self._bars = {}
+        self._forming = {}
+        self._last_ts = {}
+        self._lock = threading.Lock()
+
+    def update(self, instrument, candles, closed=False):
+        """Ingest new base candles; returns how many were new
+
+        Unless `closed` is set, the final candle is assumed to still be forming
+        and is left for the next update.
+        """
+        if not candles:
+            return 0
+        array = candles.array if closed else candles.array[:-1]
+        with self._lock:
+            last = self._last_ts.get(instrument)
+            if last is not None:
+                array = array[array['timestamp'] > last]
+            if not len(array):
+                return 0
+            for ts, o, h, l, c in array.tolist():
+                for tf in self.timeframes:
+                    self._ingest(instrument, tf, ts, o, h, l, c)
+            self._last_ts[instrument] = int(array['timestamp'][-1])
+            return len(array)
+
+    def _ingest(self, instrument, tf, ts, o, h, l, c):
+        key = (instrument, tf)
+        start = ts - ts % tf
+        bar = self._forming.get(key)
+        if bar is not None and bar[0] != start:
+            self._complete(key, bar)
+            bar = None
+        if bar is None:
+            bar = [start, o, h, l, c, 1]
+        else:
+            bar[2] = max(bar[2], h)
+            bar[3] = min(bar[3], l)
+            bar[4] = c
+            bar[5] += 1
+        if ts + self.base_interval >= start + tf:
+            self._complete(key, bar)
+            bar = None
+        self._forming[key] = bar
+
+    def _complete(self, key, bar):
+        # Bars keep their base-candle count as a sixth field; Candles ignores it
+        self._bars.setdefault(key, deque(maxlen=self.max_bars)).append(tuple(bar))
+
+    def bars(self, instrument, timeframe):
+        with self._lock:
+            rows = list(self._bars.get((instrument, timeframe), []))
+        return Candles.from_rows(rows)
+
+    def latest_features(self, instrument, timeframes=None):
+        """Latest MTF feature values from completed bars (NaN when not enough history)"""
+        out = {}
+        for tf in timeframes or [tf for tf in self.timeframes if tf != DAY]:
+            bars = self.bars(instrument, tf)
+            features = compute_features(bars) if bars else None
+            for column in MTF_COLUMNS:
+                value = features[column][-1] if features is not None else np.nan
+                out[feature_name(column, tf)] = float(value)
+        return out
+
+    def previous_day(self, instrument, now=None):
+        """High/low/close of yesterday's (UTC) bar, if the stream has closed and fully covered it
+
+        Returns None until the stream has ingested yesterday's last candle, so
+        callers fall back to requesting the daily candle instead of reusing an
+        older day.
+        """
+        now = time.time() if now is None else now
+        yesterday = int(now - now % DAY - DAY)
+        with self._lock:
+            days = self._bars.get((instrument, DAY))
+            if not days:
+                return None
+            ts, o, h, l, c, count = days[-1]
+        if ts != yesterday:
+            return None
+        # A day only partly covered by the stream would give misleading levels
+        if count < 0.95 * DAY / self.base_interval:
+            return None
+        return {'high': h, 'low': l, 'close': c}
@@ -0,0 +1,166 @@
+import time
+import uuid
+import threading
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from config import TRADE_POOL_SIZE, TRADE_SETTINGS
+
+TRADE_SIGNALS = {'BUY': 'buy', 'SELL': 'sell'}
+MAX_TRACKED_ORDERS = 1000
+
+class TradeExecutor:
+    """Places orders from confirmed signals over a pre-warmed keep-alive pool"""
+
+    def __init__(self, api_client, base_url=None, pool_size=TRADE_POOL_SIZE, settings=None):
+        self.api = api_client
+        self.base_url = (base_url or api_client.BASE_URL).rstrip('/')
+        self.pool_size = pool_size
+        self.settings = settings if settings is not None else TRADE_SETTINGS
+        self.session = self._build_session()
+        self.pool = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='trade')
+        self.latencies = {}
+        self.orders = OrderedDict()
+        self._lock = threading.Lock()
+        # Warm up in the background so constructing the executor never blocks the GUI
+        threading.Thread(target=self.warm_up, name='trade-warmup', daemon=True).start()
+
+    def _build_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({'Connection': 'keep-alive'})
+        self._sync_auth(session)
+        return session
+
+    def _sync_auth(self, session):
+        # The API client owns authentication and may refresh the token at any time
+        auth = self.api.session.headers.get('Authorization')
+        if auth:
+            session.headers['Authorization'] = auth
+
+    def warm_up(self):
+        """Open pool connections up front so the first order skips TCP/TLS setup"""
+        def ping(_):
+            try:
+                self.session.head(self.base_url, timeout=5)
+                return True
+            except Exception:
+                return False
+
+        warmed = sum(self.pool.map(ping, range(self.pool_size)))
+        if warmed:
+            print(f"✅ Trade pool warmed ({warmed}/{self.pool_size} connections)")
+        else:
+            print("⚠ Trade pool warm-up failed - connections will open on first order")
+
+    def settings_for(self, instrument):
+        cfg = dict(self.settings.get('default', {}))
+        cfg.update(self.settings.get(instrument, {}))
+        return cfg
+
+    def submit(self, instrument, signal, signal_time=None):
+        """Queue an order for a confirmed signal; returns a Future or None if not tradable"""
+        if signal not in TRADE_SIGNALS:
+            return None
+        cfg = self.settings_for(instrument)
+        if not cfg.get('enabled', False):
+            return None
+        if signal_time is None:
+            signal_time = time.perf_counter()
+        client_order_id = uuid.uuid4().hex
+        return self.pool.submit(self._execute, instrument, signal, cfg, client_order_id, signal_time)
+
+    def submit_many(self, signals, signal_time=None):
+        """Submit several (instrument, signal) pairs concurrently"""
+        if signal_time is None:
+            signal_time = time.perf_counter()
+        futures = [self.submit(instrument, signal, signal_time) for instrument, signal in signals]
+        return [f for f in futures if f is not None]
+
+    def _execute(self, instrument, signal, cfg, client_order_id, signal_time):
+        endpoint = f"{self.base_url}{self.api.TRADE_PATH}"
+        payload, headers = self.api.trade_request(
+            instrument, cfg.get('amount', 1), TRADE_SIGNALS[signal], cfg.get('duration', 1),
+            client_order_id=client_order_id
+        )
+        retries = cfg.get('retries', 0)
+        result = {'success': False, 'message': 'not sent'}
+        response = None
+
+        # Only transport errors and 5xx are retried; the idempotency key makes that safe
+        for attempt in range(retries + 1):
+            self._sync_auth(self.session)
+            try:
+                response = self.session.post(
+                    endpoint, json=payload, headers=headers, timeout=cfg.get('timeout', 3)
+                )
+            except Exception as e:
+                response = None
+                result = {'success': False, 'message': str(e)}
+            else:
+                if response.status_code < 500:
+                    break
+                result = {'success': False, 'message': f"HTTP {response.status_code}"}
+            if attempt < retries:
+                time.sleep(0.05 * (attempt + 1))
+
+        # Anything below 500 is final, whether or not its body decodes
+        if response is not None and response.status_code < 500:
+            result = self._decode(response)
+
+        latency = time.perf_counter() - signal_time
+        result['instrument'] = instrument
+        result['signal'] = signal
+        result['client_order_id'] = client_order_id
+        result['latency_ms'] = latency * 1000
+        self._record(instrument, client_order_id, latency, result)
+
+        if result.get('success'):
+            print(f"✅ Order placed: {instrument} {signal} ({latency * 1000:.0f} ms)")
+        else:
+            print(f"⚠ Order failed: {instrument} {signal}: {result.get('message')}")
+        return result
+
+    def _decode(self, response):
+        try:
+            result = response.json()
+        except ValueError:
+            result = None
+        if not isinstance(result, dict):
+            result = {'success': False, 'message': f"HTTP {response.status_code}: unexpected response body"}
+        if response.status_code >= 400:
+            result['success'] = False
+            result.setdefault('message', f"HTTP {response.status_code}")
+        return result
+
+    def _record(self, instrument, client_order_id, latency, result):
+        with self._lock:
+            self.latencies.setdefault(instrument, deque(maxlen=500)).append(latency)
+            self.orders[client_order_id] = result
+            while len(self.orders) > MAX_TRACKED_ORDERS:
+                self.orders.popitem(last=False)
+
+    def latency_stats(self, instrument=None):
+        """Signal-to-order latency summary in milliseconds"""
+        with self._lock:
+            if instrument is not None:
+                samples = list(self.latencies.get(instrument, []))
+            else:
+                samples = [v for values in self.latencies.values() for v in values]
+        if not samples:
+            return {'count': 0}
+        samples.sort()
+        return {
+            'count': len(samples),
+            'mean_ms': sum(samples) / len(samples) * 1000,
+            'p50_ms': samples[len(samples) // 2] * 1000,
+            'p95_ms': samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000,
+            'max_ms': samples[-1] * 1000
+        }
+
+    def shutdown(self):
+        self.pool.shutdown(wait=True)
+        self.session.close()